@@ -3,9 +3,13 @@
 from os import name, system
 from random import shuffle
 from time import sleep
-from typing import List
+from typing import Any, Generator, Iterable, List, Tuple
+
+COUNT_SYMBOLS = ('0', '1', '2', '3', '4', '5', '6', '7', '8')  # # of surrounding mines -> key symbol
+HIDDEN_SYMBOLS = ('0', '?', '?', '?', '?', '?', '?', '?', '?')  # # of surrounding mines -> board symbol
 
 key = None
+_parsed_key = None, None  # (the key string last parsed by open(), its 2d-grid of hints w/ -1 for each mine)
 
 
 def clearscreen(enabled=False):
@@ -14,58 +18,111 @@ def clearscreen(enabled=False):
         sleep(.01)
 
 
+def _key_grid() -> List[List[int]]:
+    global _parsed_key
+
+    # Only re-parse the key when it has been replaced since the last call
+    source, _key = _parsed_key
+    if source is not key:
+        _key = [[-1 if c == 'x' else int(c) for c in _row.split()] for _row in key.splitlines()]
+        _parsed_key = key, _key
+    return _key
+
+
 def open(row: int, column: int) -> int:
-    _key: List[List[str]] = [[c for c in _row.split()] for _row in key.splitlines()]
-    res: str = _key[row][column]
-    assert res != 'x'
-    return int(res)
+    res = _key_grid()[row][column]
+    assert res != -1
+    return res
 
 
-def gen_board(rows: int, columns: int, nmines: int = None):
-    def update_left_right(r, c):
-        # Update Left
-        if c and board[r][c - 1] != 'x':
-            board[r][c - 1] += 1
+def open_batch(coords: Iterable[Tuple[int, int]]) -> List[int]:
+    """
+    Opens several squares in one call. (Same result as calling open() on each, but the key is only checked once)
+
+    :param coords: the row & column of each square to open
+    :return: the hint under each square, in the order given
+    """
+
+    _key = _key_grid()
+    res = [_key[row][column] for row, column in coords]
+    assert -1 not in res
+    return res
+
+
+def neighbor_sums(grid: List[List[int]]) -> List[List[int]]:
+    """
+    Sums the 8 neighbors of every cell in a rectangular 2d-grid of integers. (a 3x3 box filter, minus the center)
+
+    :param grid: a list of lists of integers, such as a 0/1 mask of mine locations
+    :return: a list of lists where each cell holds the sum of the cells surrounding it in grid
+    """
+
+    # Sum each cell with its left & right neighbors
+    rowsums = [[left + mid + right for left, mid, right in zip([0] + row, row, row[1:] + [0])] for row in grid]
 
-        # Update Right
-        if c < columns - 1 and board[r][c + 1] != 'x':
-            board[r][c + 1] += 1
+    # Sum each row of sums with the rows above & below, then remove the center cell
+    padding = [0] * len(grid[0])
+    padded = [padding] + rowsums + [padding]
+    return [[up + mid + down - center for up, mid, down, center in zip(above, middle, below, row)]
+            for above, middle, below, row in zip(padded, padded[1:], padded[2:], grid)]
 
-    def make_string(hidden=False):
-        return "\n".join((' '.join(('?' if hidden and c != 0 else str(c) for c in row)) for row in board)) + "\n"
 
+def _bitcount(mask: int) -> int:
+    """
+    Counts the set bits of an integer bitmask. (bitcount falls back on this before Python 3.10, see below)
+
+    :param mask: a non-negative integer
+    :return: the # of 1s in the binary representation of mask
+    """
+
+    return bin(mask).count('1')
+
+
+bitcount = getattr(int, 'bit_count', _bitcount)  # int.bit_count is a popcount in C, w/o building the binary string
+
+
+def bits(mask: int) -> Generator[int, Any, None]:
+    """
+    Yields the index of each set bit of an integer bitmask, lowest first.
+
+    :param mask: a non-negative integer
+    :return: a generator that yields the indices of the 1s in the binary representation of mask
+    """
+
+    while mask:
+        bit = mask & -mask
+        yield bit.bit_length() - 1
+        mask ^= bit
+
+
+def gen_board(rows: int, columns: int, nmines: int = None):
     if nmines is None:
         nmines = int((rows * columns) * (1 / 5))
     assert nmines < rows * columns
 
-    board, key = "", ""
-    # only return a board with at least one '0' in it
-    while '0' not in key:
-        board = [0 for _ in range(rows * columns)]  # create empty board in 1 dimension
-        board[:nmines] = ['x' for _ in range(nmines)]  # populate the first few spaces with mines
-        shuffle(board)  # mix up the board
-        board = [board[n * columns: (n + 1) * columns] for n in range(rows)]  # translate board into 2 dimensions
-        mine_spots = [(r, c) for r in range(rows) for c in range(columns) if board[r][c] == 'x']  # find the mines
-
-        # For each mine:
-        for _ in range(len(mine_spots)):
-            row_num, col_num = mine_spots.pop()
-            # Update counts in squares left & right of mine
-            update_left_right(row_num, col_num)
-
-            # Update squares in row above
-            if row_num:
-                if board[row_num - 1][col_num] != 'x':
-                    board[row_num - 1][col_num] += 1
-                update_left_right(row_num - 1, col_num)
-
-            # Update squares in row below
-            if row_num < rows - 1:
-                if board[row_num + 1][col_num] != 'x':
-                    board[row_num + 1][col_num] += 1
-                update_left_right(row_num + 1, col_num)
-        board, key = make_string(hidden=True), make_string()
-    return board, key
+    cells = [1 if n < nmines else 0 for n in range(rows * columns)]  # populate the first few spaces with mines
+    while True:
+        shuffle(cells)  # mix up the board
+        mines = [cells[n * columns: (n + 1) * columns] for n in range(rows)]  # translate board into 2 dimensions
+
+        # Count the mines surrounding every square in a single pass over the board
+        counts = neighbor_sums(mines)
+
+        # only return a board with at least one '0' in it
+        if any(not mine and not count for mine_row, count_row in zip(mines, counts)
+               for mine, count in zip(mine_row, count_row)):
+            break
+
+    # Write out the hidden board & its key together in a single pass over the squares
+    board, key = [], []
+    for mine_row, count_row in zip(mines, counts):
+        board_row, key_row = [], []
+        for mine, count in zip(mine_row, count_row):
+            key_row.append('x' if mine else COUNT_SYMBOLS[count])
+            board_row.append('?' if mine else HIDDEN_SYMBOLS[count])
+        board.append(' '.join(board_row))
+        key.append(' '.join(key_row))
+    return "\n".join(board) + "\n", "\n".join(key) + "\n"
 
 
 if __name__ == '__main__':
@@ -1,23 +1,14 @@
 #  Copyright (c) 2020. Christopher J Maxwell <contact@christopherjmaxwell.com>
 
-from typing import List, Union
-
-from minesweeper import gen_board
-
-
-def open(row: int, column: int) -> Union[bool, int]:
-    assert 'board' in globals()
-    _key: List[List[str]] = [[c for c in _row.split()] for _row in key.splitlines()]
-    res: str = _key[row][column]
-    assert res != 'x'
-    return int(res)
+import minesweeper
+from minesweeper import gen_board, open
 
 
 def solve_mine(map, n):
     # coding and coding...
     def get_adjacent(row, col):
         return {(r, c) for r in range(row - 1, row + 2) for c in range(col - 1, col + 2) if
-                -1 < r < len(board) and -1 < c < len(board[r]) and (r, c) != (row, col)}
+                -1 < r < len(board) and -1 < c < len(board[r]) and (r != row or c != col)}
 
     def unpack_zeros(zeros):
         wave = 0
@@ -28,14 +19,15 @@ def solve_mine(map, n):
         print()
         frontier = set()
         while zeros:
-            for _ in range(len(zeros)):
-                expandable = {pos for pos in get_adjacent(*zeros.pop()) if board[pos[0]][pos[1]] == '?'}
-                for row, col in expandable:
-                    board[row][col] = str(open(row, col))
-                    if board[row][col] == '0':
-                        zeros.add((row, col))
-                    else:
-                        frontier.add((row, col))
+            # Grow the wave of zeros by one square in every direction, keeping only the ?s it reaches
+            expandable = {pos for zero in zeros for pos in get_adjacent(*zero) if board[pos[0]][pos[1]] == '?'}
+            zeros = set()
+            for row, col in expandable:
+                board[row][col] = str(open(row, col))
+                if board[row][col] == '0':
+                    zeros.add((row, col))
+                else:
+                    frontier.add((row, col))
 
             print(f'Wave: {wave}')
             wave += 1
@@ -130,5 +122,6 @@ if __name__ == '__main__':
     rows, columns = 5, 5
     nmines = rows*columns//5
     board, key = gen_board(rows, columns)
+    minesweeper.key = key
     print(solve_mine(board, nmines))
 
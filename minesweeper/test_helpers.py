@@ -0,0 +1,47 @@
+#  Copyright (c) 2020. Christopher J Maxwell <contact@christopherjmaxwell.com>
+
+import pytest
+
+import minesweeper
+
+
+def test_neighbor_sums_corners_edges():
+    # Every cell of an all-1s grid counts its neighbors: 3 in a corner, 5 along an edge & 8 inside
+    assert minesweeper.neighbor_sums([[1] * 4] * 3) == [[3, 5, 5, 3],
+                                                       [5, 8, 8, 5],
+                                                       [3, 5, 5, 3]]
+
+
+@pytest.mark.parametrize('nrows, ncols', [(1, 1), (1, 5), (4, 1), (3, 7), (6, 4)])
+def test_neighbor_sums(nrows, ncols):
+    grid = [[(r * 7 + c * 3) % 4 % 2 for c in range(ncols)] for r in range(nrows)]
+    naive = [[sum(grid[row][col] for row in range(r - 1, r + 2) for col in range(c - 1, c + 2)
+                  if (row, col) != (r, c) and -1 < row < nrows and -1 < col < ncols)
+              for c in range(ncols)] for r in range(nrows)]
+    assert minesweeper.neighbor_sums(grid) == naive
+
+
+@pytest.mark.parametrize('count', [minesweeper.bitcount, minesweeper._bitcount])
+@pytest.mark.parametrize('mask, expected', [(0, 0), (1, 1), (1 << 37, 1), ((1 << 200) - 1, 200),
+                                            ((1 << 150) | (1 << 64) | 5, 4)])
+def test_bitcount(count, mask, expected):
+    assert count(mask) == expected
+
+
+@pytest.mark.parametrize('mask, expected', [(0, []), (1, [0]), (1 << 37, [37]), ((1 << 200) - 1, list(range(200))),
+                                            ((1 << 150) | (1 << 64) | 5, [0, 2, 64, 150])])
+def test_bits(mask, expected):
+    assert list(minesweeper.bits(mask)) == expected
+
+
+def test_open_batch():
+    minesweeper.key = """1 x 1 1 x 1
+2 2 2 1 2 2
+2 x 2 0 1 x
+2 x 2 1 2 2
+1 1 1 1 x 1
+0 0 0 1 1 1"""
+    coords = [(5, 0), (0, 0), (2, 3), (3, 4), (0, 2)]
+    assert minesweeper.open_batch(coords) == [minesweeper.open(*coord) for coord in coords] == [0, 1, 0, 2, 1]
+    with pytest.raises(AssertionError):
+        minesweeper.open_batch([(0, 0), (0, 1)])  # (0, 1) is a mine
@@ -98,6 +98,12 @@ x 1 0 1 x 1 0 0 2 x 2 0 0 0 0 1 x 2 1
 0 0 0 0 1 1 1 1 2 x 1 1 1 1 0 2 3 x 2
 0 0 0 0 1 x 1 1 x 2 1 1 x 1 0 1 x 3 x
 """,
+
+        # An update_zones-derived zone w/ an inexact count used to open a mine here
+        """x 1 0 0
+1 1 0 0
+1 1 1 1
+x 1 1 x""",
     ]
 ]
 boardlist = [
@@ -194,9 +200,14 @@ boardlist = [
 0 0 0 0 ? ? ? ? ? ? ? ? ? ? 0 ? ? ? ?
 0 0 0 0 ? ? ? ? ? ? ? ? ? ? 0 ? ? ? ?
 """,
+
+        """? ? 0 0
+? ? 0 0
+? ? ? ?
+? ? ? ?""",
     ]
 ]
-anslist = [True, True, False, True, False, True, False]
+anslist = [True, True, False, True, False, True, False, True]
 
 
 class Args:
@@ -108,7 +108,15 @@ x 1 0 1 x 1 0 0 2 x 2 0 0 0 0 1 x 2 1
 x 2 1 1 0 0 0 0 0 0 1 1 1 0 1 1 1 1 x 1 0 2 2 3 1 3 2
 1 2 x 1 0 0 0 0 0 0 1 x 1 0 0 0 0 1 1 1 0 1 x 2 1 2 x
 0 1 1 1 0 0 0 0 0 0 1 1 1 0 0 0 0 0 0 0 0 1 2 3 x 2 1
-0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 x 2 1 0"""
+0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 x 2 1 0""",
+
+        # exclusive_deduction's old min-overlap rule flagged a safe square here
+        """1 2 x 1 0
+1 x 3 2 1
+1 1 2 x 1
+0 0 1 1 1
+1 2 3 2 1
+1 x x x 1""",
     ]
 ]
 boardlist = [
@@ -215,10 +223,17 @@ boardlist = [
 ? ? ? ? 0 0 0 0 0 0 ? ? ? 0 ? ? ? ? ? ? 0 ? ? ? ? ? ?
 ? ? ? ? 0 0 0 0 0 0 ? ? ? 0 0 0 0 ? ? ? 0 ? ? ? ? ? ?
 0 ? ? ? 0 0 0 0 0 0 ? ? ? 0 0 0 0 0 0 0 0 ? ? ? ? ? ?
-0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 ? ? ? ? 0"""
+0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 ? ? ? ? 0""",
+
+        """? ? ? ? 0
+? ? ? ? ?
+? ? ? ? ?
+0 0 ? ? ?
+? ? ? ? ?
+? ? ? ? ?""",
     ]
 ]
-anslist = [True, True, False, True, False, True, False, True, True]
+anslist = [True, True, False, True, False, True, False, True, True, True]
 
 
 class Args:
@@ -1,31 +1,33 @@
 #  Copyright (c) 2020. Christopher J Maxwell <contact@christopherjmaxwell.com>
 
-from typing import Dict, FrozenSet, List, Optional, Tuple
+from collections import deque
+from typing import Dict, List, Tuple
 
 import minesweeper
-from minesweeper import clearscreen, open
+from minesweeper import bitcount, bits, clearscreen, open, open_batch
+
+# Hints are stored as ints: 0-8 for an opened space, or one of the negative sentinels below
+UNKNOWN, MINE = -1, -2
+SYMBOLS = ('0', '1', '2', '3', '4', '5', '6', '7', '8', 'x', '?')  # hint -> symbol (sentinels index from the end)
+HINTS = {symbol: hint for hint, symbol in zip((*range(9), MINE, UNKNOWN), SYMBOLS)}  # symbol -> hint
 
 
 class Gridspace:
     """Represents a space on the board which is aware of its neighbors & the # of mines around it."""
 
-    def __init__(self, r: int, c: int, hint: str, nrows: int, ncols: int):
+    __slots__ = ('row', 'col', 'index', 'hint', 'neighbors', 'num_undiscovered', 'num_unknown')
+
+    def __init__(self, r: int, c: int, hint: int, nrows: int, ncols: int):
         self.row = r
         self.col = c
+        self.index = r * ncols + c  # position in a flat, row-major list of the board's spaces
         self.hint = hint
-        self.ties = set()
-        self.neighbors = {
-            'up': (r - 1, c) if r - 1 > -1 else None,
-            'left': (r, c - 1) if c - 1 > -1 else None,
-            'down': (r + 1, c) if r + 1 < nrows else None,
-            'right': (r, c + 1) if c + 1 < ncols else None,
-            'top_left': (r - 1, c - 1) if r - 1 > -1 and c - 1 > -1 else None,
-            'bottom_left': (r + 1, c - 1) if r + 1 < nrows and c - 1 > -1 else None,
-            'top_right': (r - 1, c + 1) if r - 1 > -1 and c + 1 < ncols else None,
-            'bottom_right': (r + 1, c + 1) if r + 1 < nrows and c + 1 < ncols else None
-        }
+        self.neighbors = tuple(
+            (row, col) for row in range(r - 1, r + 2) for col in range(c - 1, c + 2)
+            if (row, col) != (r, c) and -1 < row < nrows and -1 < col < ncols
+        )
         self.num_undiscovered = -1
-        self.zones = {}
+        self.num_unknown = 0
 
     @property
     def position(self) -> Tuple:
@@ -37,40 +39,35 @@ class Gridspace:
         return self.row, self.col
 
     def __str__(self):
-        return f'({self.row},{self.col}): {self.hint}: {self.num_undiscovered}'
+        return f'({self.row},{self.col}): {SYMBOLS[self.hint]}: {self.num_undiscovered}'
 
     def __repr__(self):
         return f'Position: ({self.row},{self.col})' \
-               f'Hint: {self.hint}' \
+               f'Hint: {SYMBOLS[self.hint]}' \
                f'# Undiscovered mines in vicinity: {self.num_undiscovered}'
 
 
-def boardtohashmap(board_2d: List[List[str]]) -> Dict[Tuple[int, int], Gridspace]:
+def boardtohashmap(board_2d: List[List[str]]) -> List[Gridspace]:
     """
-    Creates a dictionary that represent the evolving gameboard during play.
+    Lists the spaces of the evolving gameboard during play. (Each space's neighbors are linked directly)
 
     :param board_2d: a list of lists representing the 2d-board
-    :return: a dictionary that represent the evolving gameboard during play.
+    :return: every space of the board in row-major order, so the space @ (r, c) sits at index r * ncols + c
     """
 
     nrows, ncols = len(board_2d), len(board_2d[0])
-    return {
-        (r, c): Gridspace(r, c, board_2d[r][c], nrows, len(board_2d[r]))
-        for r in range(nrows) for c in range(len(board_2d[r]))
-    }
-
-
-def hashmaptostring(hashmap: Dict[Tuple[int, int], Gridspace], nrows: int, ncols: int) -> str:
-    """
-    Get a string representation of the 2d-board state during play.
+    spaces = [Gridspace(r, c, HINTS[board_2d[r][c]], nrows, ncols) for r in range(nrows) for c in range(ncols)]
 
-    :param hashmap: a dictionary representing the 2d-board during play
-    :param nrows: # of rows in the 2d-board
-    :param ncols: # of columns in the 2d-board
-    :return: a string representation of the 2d-board state during play
-    """
+    # Swap each space's neighbor coords for the neighboring spaces themselves
+    for space in spaces:
+        space.neighbors = tuple(spaces[row * ncols + col] for row, col in space.neighbors)
 
-    return "\n".join(" ".join(hashmap[(r, c)].hint for c in range(ncols)) for r in range(nrows))
+    # Count the '?'s & undiscovered mines around each space once; the solver keeps them up to date from here on
+    for space in spaces:
+        space.num_unknown = sum(1 for neighbor in space.neighbors if neighbor.hint == UNKNOWN)
+        if space.hint >= 0:
+            space.num_undiscovered = space.hint - sum(1 for neighbor in space.neighbors if neighbor.hint == MINE)
+    return spaces
 
 
 def splitgrid(gridstr: str) -> List[List[str]]:
@@ -84,6 +81,17 @@ def splitgrid(gridstr: str) -> List[List[str]]:
     return [row.split() for row in gridstr.splitlines()]
 
 
+def gridtostring(grid: List[List[str]]) -> str:
+    """
+    Joins a 2d-list representing a 2d-board into a string representation of the 2d-board. (inverse of splitgrid)
+
+    :param grid: a 2d-list representing a 2d-board
+    :return: a string representation of the 2d-board
+    """
+
+    return "\n".join(" ".join(row) for row in grid)
+
+
 def solve_mine(map: str, n: int) -> str:
     """
     Plays a game of Minesweeper as far as possible without making a guess. (Kata mandated entry point for program.)
@@ -93,89 +101,126 @@ def solve_mine(map: str, n: int) -> str:
     :return: a string representation of the solved 2d-board or a single '?' if board is unsolvable.
     """
 
-    def get_frontier() -> Dict[Tuple[int, int], Gridspace]:
+    def reveal(space: Gridspace, hint: int = None) -> int:
         """
-        Get '?'-adjacent hint spaces
+        Open the '?' space & update the counts of its neighbors.
 
-        :return: a dictionary of coordinates pairs & Gridspace objects identifying spaces w/ a neighboring '?'
+        :param space: the space to open
+        :param hint: the hint @ space, if it has already been opened w/ open_batch
+        :return: the hint unveiled @ space
         """
 
-        return {pos: space for pos, space in lookup.items() if space.hint.isnumeric() and any(
-            lookup[neighbor].hint == '?' for neighbor in space.neighbors.values() if neighbor)}
+        space.hint = open(space.row, space.col) if hint is None else hint
+        board_2d[space.row][space.col] = SYMBOLS[space.hint]
+        space.num_undiscovered = space.hint - sum(1 for neighbor in space.neighbors if neighbor.hint == MINE)
+        if space.num_unknown:
+            frontier.add(space.index)
+        for neighbor in space.neighbors:
+            neighbor.num_unknown -= 1
+            if not neighbor.num_unknown:
+                frontier.discard(neighbor.index)
+        return space.hint
+
+    def mark(space: Gridspace) -> bool:
+        """
+        Mark the '?' space as a mine & update the counts of its neighbors.
+
+        :param space: the space to mark
+        :return: True if space was marked; False if it was no longer a '?' (its neighbors' counts are left as-is)
+        """
 
-    def get_exclusion_zones(frontier: Dict[Tuple[int, int], Gridspace]) -> Dict[
-        FrozenSet[Optional[Tuple[int, int]]], int]:
+        if space.hint != UNKNOWN:
+            return False
+        space.hint = MINE
+        board_2d[space.row][space.col] = SYMBOLS[MINE]
+        for neighbor in space.neighbors:
+            neighbor.num_unknown -= 1
+            neighbor.num_undiscovered -= 1
+            if not neighbor.num_unknown:
+                frontier.discard(neighbor.index)
+        return True
+
+    def get_exclusion_zones() -> Dict[int, int]:
         """
         Group the frontier-adjacent '?' spaces into pairs of "zone, frequency", where 'zone' is a group of spaces & 'frequency' is the # of mines hiding in zone.
+        Zones are bitmasks; bit n of a zone stands for the space zone_spaces[n]. (Side-effect: rebuilds zone_spaces)
 
-        :param frontier: a dictionary representing the squares immediately surrounded by '?'s
         :return: a dictionary of zones & the # of mines within those zones
         """
 
+        bit_of = {}
+        zone_spaces.clear()
         exclusion_zones = {}
-        for pos, space in frontier.items():
-            nunkown = int(space.hint) - sum(
-                1 for neighbor in space.neighbors.values() if neighbor and lookup[neighbor].hint == 'x')
-            exclusion_zones.update(
-                {frozenset(neighbor for neighbor in space.neighbors.values() if
-                           neighbor and lookup[neighbor].hint == '?'): nunkown})
+        for index in sorted(frontier):  # row-major, as the board was scanned before the frontier was kept as a set
+            space = lookup[index]
+            nunkown = space.num_undiscovered
+            zone = 0
+            for neighbor in space.neighbors:
+                if neighbor.hint == UNKNOWN:
+                    if neighbor not in bit_of:
+                        bit_of[neighbor] = len(zone_spaces)
+                        zone_spaces.append(neighbor)
+                    zone |= 1 << bit_of[neighbor]
+            # Hints sharing the same '?'s must agree on how many mines they hide; if they don't, a mark was wrong
+            if exclusion_zones.setdefault(zone, nunkown) != nunkown:
+                raise ValueError(
+                    'Contradicting hints around {}'.format([zone_spaces[bit].position for bit in bits(zone)]))
         return exclusion_zones
 
-    def group_by_coord(exclusion_zones: Dict[FrozenSet[Optional[Tuple[int, int]]], int]):
+    def group_by_coord(exclusion_zones: Dict[int, int]):
         """
         Get a nested dictionary tracking which squares are in which zones.
 
         :param exclusion_zones: a dictionary of zones & the # of mines within those zones
-        :return: Nested dictionary as such, {(row, col): {frequency: {zone0, zone1, ...}}}
+        :return: Nested dictionary as such, {bit: {frequency: {zone0, zone1, ...}}}
         """
         by_coord = {}
         for zone in exclusion_zones:
             freq = exclusion_zones[zone]
-            for spot in zone:
+            for spot in bits(zone):
                 by_coord[spot] = by_coord.setdefault(spot, dict())
                 by_coord[spot][freq] = by_coord[spot].setdefault(freq, set())
                 by_coord[spot][freq].add(zone)
         return by_coord
 
-    def update_zones(exclusion_zones: Dict[FrozenSet[Optional[Tuple[int, int]]], int]) -> Tuple[bool, bool]:
+    def update_zones(exclusion_zones: Dict[int, int]) -> bool:
         """
-        Deduces additional exclusion zones from visible hints & known zones. (May also find & mark mines).
+        Compares the zones sharing a space to find & mark mines. (May also open the safe spaces a mine exposes).
+        Zones of equal frequency may split their mines any which way & the part of one zone outside another only holds
+        *at least* the difference of their frequencies, so neither is kept as a zone; but a lone space which must hold
+        at least one mine is a mine.
 
         :param exclusion_zones: a dictionary of zones & the # of mines within those zones
-        :return: Whether any additional zones were discovered + whether any mines were discovered. (Side-effect: updates solve_mine.lookup)
+        :return: Whether any mines were discovered. (Side-effect: updates solve_mine.lookup)
         """
 
-        if len(exclusion_zones) == 3:
-            print(end='')
-
         by_coord = group_by_coord(exclusion_zones)
-        mine_found, zone_added = False, False
 
         for coord, zones_by_frequency in by_coord.items():
             for freq, zones in zones_by_frequency.items():
                 for other_freq, other_zones in zones_by_frequency.items():
+                    if freq == other_freq:
+                        continue
                     for zone in zones:
                         for other_zone in other_zones:
-                            if freq == other_freq:
-                                new_zone = zone ^ other_zone
-                                if new_zone and new_zone not in exclusion_zones:
-                                    exclusion_zones[new_zone] = 1
-                                    zone_added = True
-                            else:
-                                new_zone = zone - other_zone if freq > other_freq else other_zone - zone
-                                if len(new_zone) > 1:
-                                    exclusion_zones[new_zone] = abs(freq - other_freq)
-                                else:
-                                    lookup[set(new_zone).pop()].hint = 'x'
-                                    mine_found = True
-                                    if display:
-                                        clearscreen()
-                                        print(hashmaptostring(lookup, nrows, ncols))
-                                        print()
-                                    return mine_found, mine_found
-        return zone_added, mine_found
-
-    def find_by_exclusion_zone(exclusion_zones: Dict[FrozenSet[Optional[Tuple[int, int]]], int],
+                            high, low = (zone, other_zone) if freq > other_freq else (other_zone, zone)
+                            new_zone = high & ~low
+                            if bitcount(new_zone) != 1 or not mark(zone_spaces[new_zone.bit_length() - 1]):
+                                continue
+                            if abs(freq - other_freq) == 1:
+                                # Only sound since both counts are exact: high's other f_high - 1 = f_low mines lie
+                                #  within low, so the part of low outside of high is a zone of 0 mines
+                                for bit in bits(low & ~high):
+                                    if zone_spaces[bit].hint == UNKNOWN:
+                                        reveal(zone_spaces[bit])
+                            if display:
+                                clearscreen()
+                                print(gridtostring(board_2d))
+                                print()
+                            return True
+        return False
+
+    def find_by_exclusion_zone(exclusion_zones: Dict[int, int],
                                display: bool = False) -> bool:
         """
         Find & open safe-spaces by comparing zones of mutual exclusivity based off exposed hints.
@@ -185,117 +230,149 @@ def solve_mine(map: str, n: int) -> str:
         :return: True if board state was altered. (Updates param exclusion_zones & solve_mine.lookup by side-effect)
         """
 
-        opened = set()
+        opened = 0
         updated = False
-        # Check for zones which are entirely within a different, larger zone
-        for zone, level in sorted(list(exclusion_zones.items()), key=lambda pair: len(pair[0]), reverse=False):
-            for other, other_level in sorted(list(exclusion_zones.items()), key=lambda pair: len(pair[0]),
-                                             reverse=True):
-                if len(zone) > len(other):
-                    # Only perform check when zone is small enough
-                    #  to fit inside other
-                    break
-                elif zone < other:  # set operation: 'Proper-subset' (aka. "zone.issubset(other) and zone != other")
-                    exclusion_zones.pop(other)  # Pull out larger group for modification
-                    new_zone = frozenset(other - zone)  # Remove smaller group from larger group
-
-                    if other_level - level > 0:
-                        # Update # of mines in 'larger' group after removing smaller group;
-                        #  Put back modified 'larger' group
-                        exclusion_zones[new_zone] = other_level - level
-                    else:
-                        # OR,
-                        #   If the # of mines in the modified group is 0,
-                        #   we can safely open all spaces in that group, instead
-                        for pos in new_zone:
-                            if lookup[pos].hint == '?':
-                                lookup[pos].hint = f'{open(*pos)}'
-                                opened.add(pos)
-                                updated = True
-                                if display:
-                                    clearscreen()
-                                    print(hashmaptostring(lookup, nrows, ncols))
-                                    print()
+
+        # Index the zones by the spaces they contain & bucket them by size
+        by_coord = {}
+        by_size = [[] for _ in range(len(zone_spaces) + 1)]
+        for zone, level in exclusion_zones.items():
+            for bit in bits(zone):
+                by_coord.setdefault(bit, set()).add(zone)
+            by_size[bitcount(zone)].append((zone, level))
+
+        # Check for zones which are entirely within a different, larger zone (smallest zones first)
+        for zone, level in (pair for bucket in by_size for pair in bucket):
+            # A zone containing every space in zone is listed in the index under each of those spaces,
+            #  so intersecting those listings yields exactly the proper-supersets of zone
+            for other in set.intersection(*(by_coord[bit] for bit in bits(zone))) - {zone}:
+                other_level = exclusion_zones.pop(other)  # Pull out larger group for modification
+                new_zone = other & ~zone  # Remove smaller group from larger group
+                for bit in bits(other):
+                    by_coord[bit].discard(other)
+
+                if other_level - level > 0:
+                    # Update # of mines in 'larger' group after removing smaller group;
+                    #  Put back modified 'larger' group
+                    exclusion_zones[new_zone] = other_level - level
+                    for bit in bits(new_zone):
+                        by_coord[bit].add(new_zone)
+                else:
+                    # OR,
+                    #   If the # of mines in the modified group is 0,
+                    #   we can safely open all spaces in that group, instead
+                    for bit in bits(new_zone):
+                        space = zone_spaces[bit]
+                        if space.hint == UNKNOWN:
+                            reveal(space)
+                            opened |= 1 << bit
+                            updated = True
 
         for zone, freq in list(exclusion_zones.items()):
-            new_zone = zone - opened
+            new_zone = zone & ~opened
             exclusion_zones.pop(zone)
             if new_zone:
                 exclusion_zones[new_zone] = freq
 
-        if display:
+        if display and updated:
             clearscreen()
-            print(hashmaptostring(lookup, nrows, ncols))
+            print(gridtostring(board_2d))
             print()
         return updated
 
     def open_zeros(display: bool = False) -> None:
         """
-        Unveil hints of squares neighboring a square with no surrounding mines.
+        Unveil hints of squares neighboring a square with no surrounding mines. (& of zeros unveiled on the way)
 
         :param display: Prints board state after execution if True
         :return: None
         """
 
         if display:
-            print(hashmaptostring(lookup, nrows, ncols), '\n')
-        for pos, space in lookup.items():
-            if space.hint == '0':
-                for neighbor in space.neighbors.values():
-                    if neighbor and lookup[neighbor].hint == '?':
-                        lookup[neighbor].hint = f"{open(*neighbor)}"
+            print(gridtostring(board_2d), '\n')
+        zeros = deque(space for space in lookup if space.hint == 0)
+        while zeros:
+            hidden = [neighbor for neighbor in zeros.popleft().neighbors if neighbor.hint == UNKNOWN]
+            for neighbor, hint in zip(hidden, open_batch((neighbor.row, neighbor.col) for neighbor in hidden)):
+                if reveal(neighbor, hint) == 0:
+                    zeros.append(neighbor)
         if display:
             clearscreen()
-            print(hashmaptostring(lookup, nrows, ncols))
+            print(gridtostring(board_2d))
             print()
 
-    def mark_spaces(display: bool = False) -> int:
+    def propagate(display: bool = False) -> Tuple[bool, int]:
         """
-        Deduce which squares are holding mines based off visible hints & mark them w/ an 'x'.
+        Deduce which squares are holding mines & which ARE NOT based off visible hints; mark the former w/ an 'x' &
+        'open' the latter. Repeats on the hints around each altered space until no hint yields anything new.
 
         :param display: Prints board state after execution if True
-        :return: # of mines found during this invocation
+        :return: True if board state was altered + the # of mines found during this invocation
         """
 
-        nfound = 0
-        for space in lookup.values():
-            if space.hint.isnumeric():
-                proximity = int(space.hint)
-                if proximity > 0 and proximity == sum(
-                        1 for neighbor in space.neighbors.values() if neighbor and lookup[neighbor].hint in 'x?'):
-                    for neighbor in space.neighbors.values():
-                        if neighbor and lookup[neighbor].hint == '?':
-                            lookup[neighbor].hint = 'x'
-                            nfound += 1
-        if display and nfound:
+        updated, nfound = False, 0
+        dirty = set(frontier)
+        while dirty:
+            space = lookup[dirty.pop()]
+            if not space.num_unknown:
+                continue
+            if space.num_undiscovered == 0:
+                settle = reveal
+            elif space.num_undiscovered == space.num_unknown:
+                settle = mark
+                nfound += space.num_unknown
+            else:
+                continue
+            for neighbor in space.neighbors:
+                if neighbor.hint == UNKNOWN:
+                    settle(neighbor)
+                    updated = True
+                    # Only the hints around a settled space (& the space itself, once opened) can have changed
+                    for other in (neighbor,) + neighbor.neighbors:
+                        if other.hint >= 0 and other.num_unknown:
+                            dirty.add(other.index)
+        if display and updated:
             clearscreen()
-            print(hashmaptostring(lookup, nrows, ncols))
+            print(gridtostring(board_2d))
             print()
-        return nfound
+        return updated, nfound
 
-    def open_safe_spaces(display: bool = False) -> bool:
+    def propagate_units(exclusion_zones: Dict[int, int]) -> Tuple[bool, int]:
         """
-        Deduce which squares ARE NOT holding mines based off visible hints & 'open' them.
+        Open every zone known to hold no mines & mark every zone known to be full of mines, then remove those spaces from the other zones & repeat until no such zones remain.
 
-        :param display: Prints board state after execution if True
-        :return: True if board state was altered during this invocation
+        :param exclusion_zones: a dictionary of zones & the # of mines within those zones
+        :return: True if board state was altered + the # of mines marked. (Updates param exclusion_zones & solve_mine.lookup by side-effect)
         """
 
-        space_unpacked = False
-        for space in lookup.values():
-            if space.hint.isnumeric():
-                proximity = int(space.hint)
-                if proximity > 0 and proximity == sum(
-                        1 for neighbor in space.neighbors.values() if neighbor and lookup[neighbor].hint == 'x'):
-                    for neighbor in space.neighbors.values():
-                        if neighbor and lookup[neighbor].hint == '?':
-                            lookup[neighbor].hint = f"{open(*neighbor)}"
-                            space_unpacked = True
-        if display and space_unpacked:
-            clearscreen()
-            print(hashmaptostring(lookup, nrows, ncols))
-            print()
-        return space_unpacked
+        updated, nmarked = False, 0
+        units = [zone for zone, freq in exclusion_zones.items() if freq == 0 or freq == bitcount(zone)]
+        while units:
+            zone = units.pop()
+            if zone not in exclusion_zones:
+                continue
+            freq = exclusion_zones.pop(zone)
+            for bit in bits(zone):
+                space = zone_spaces[bit]
+                if space.hint == UNKNOWN:
+                    if freq:
+                        mark(space)
+                        nmarked += 1
+                    else:
+                        reveal(space)
+                    updated = True
+
+            # The spaces of zone are settled; take them (& any mines among them) out of the zones that share them
+            for other, other_freq in list(exclusion_zones.items()):
+                shared = other & zone
+                if shared:
+                    exclusion_zones.pop(other)
+                    new_zone, new_freq = other & ~zone, other_freq - (bitcount(shared) if freq else 0)
+                    if new_zone:
+                        exclusion_zones[new_zone] = new_freq
+                        if new_freq == 0 or new_freq == bitcount(new_zone):
+                            units.append(new_zone)
+        return updated, nmarked
 
     def find_safe_spaces(display: bool = False) -> Tuple[bool, int]:
         """
@@ -305,75 +382,60 @@ def solve_mine(map: str, n: int) -> str:
         :return: True if board state was altered + the # of mines marked during this invocation
         """
 
-        zone_found = True
-        mine_found = False
-        updated = False
+        mine_found = True
 
-        frontier = get_frontier()
-        exclusion_zones = get_exclusion_zones(frontier)
+        exclusion_zones = get_exclusion_zones()
+        updated, nmarked = propagate_units(exclusion_zones)
 
-        """while not updated:
+        while mine_found:
             updated |= find_by_exclusion_zone(exclusion_zones, display)
-            if not updated:
-                updated, mine_found = update_zones(exclusion_zones)
-                if not updated:
-                    break"""
-        while zone_found:
-            updated |= find_by_exclusion_zone(exclusion_zones, display)
-            if len(exclusion_zones) == 3:
-                print(end='')
-            old_zones = exclusion_zones
-            zone_found, mine_found = update_zones(exclusion_zones)
-            if old_zones == exclusion_zones:
-                print(end='')
+            units_updated, units_marked = propagate_units(exclusion_zones)
+            updated |= units_updated
+            nmarked += units_marked
+            mine_found = update_zones(exclusion_zones)
             updated |= mine_found
-        return updated, mine_found
+            nmarked += mine_found
+        return updated, nmarked
 
-    board_2d = splitgrid(map)
-    nrows, ncols = len(board_2d), len(board_2d[0])
-    lookup = boardtohashmap(board_2d)
+    board_2d = splitgrid(map)  # kept in step w/ lookup by reveal() & mark() for printing
+    lookup = boardtohashmap(board_2d)  # every space, flattened in row-major order (see Gridspace.index)
+    frontier = {space.index for space in lookup if space.hint >= 0 and space.num_unknown}  # '?'-adjacent hints
+    zone_spaces = []  # the space represented by each bit of an exclusion zone
     nfound = 0
-    display = True
+    display = False  # Prints board state after each step if True
 
     # Start by opening all spaces around those marked '0'
     open_zeros(display)
 
     while nfound < n:
-        updated = False
+        # Mark discernible mines & open discernible safe spaces
+        nfound += propagate(display)[1]
+        if nfound >= n:
+            break
 
-        # Mark discernible mines
-        nmarked = mark_spaces(display)
-        updated |= nmarked
+        # Find & open additional safe spaces using set operations
+        space_updated, nmarked = find_safe_spaces(display)
         nfound += nmarked
+        if space_updated:
+            continue
 
-        # Open discernible safe spaces
-        updated |= open_safe_spaces(display)
-
-        if not updated:
-            # Find & open additional safe spaces using set operations
-            if nfound == 82:
-                print(end='')
-            space_updated, mine_found = find_safe_spaces(display)
-            nfound += mine_found
-            if space_updated:
-                continue
-
-            if display:
-                clearscreen()
-                print(hashmaptostring(lookup, nrows, ncols))
-                print()
-            return '?'
+        if display:
+            clearscreen()
+            print(gridtostring(board_2d))
+            print()
+        return '?'
 
     # All mines found; Open all remaining '?'s
-    for pos, space in lookup.items():
-        if space.hint == '?':
-            space.hint = f'{open(*pos)}'
+    hidden = [space for space in lookup if space.hint == UNKNOWN]
+    for space, hint in zip(hidden, open_batch((space.row, space.col) for space in hidden)):
+        reveal(space, hint)
 
+    solution = gridtostring(board_2d)
     if display:
         clearscreen()
-        print(hashmaptostring(lookup, nrows, ncols))
+        print(solution)
         print()
-    return hashmaptostring(lookup, nrows, ncols)
+    return solution
 
 
 def main():
@@ -1,14 +1,21 @@
 #  Copyright (c) 2020. Christopher J Maxwell <contact@christopherjmaxwell.com>
 
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Generator, Iterable, List, Tuple
 
 import minesweeper
-from minesweeper import open
+from minesweeper import bitcount, bits, neighbor_sums, open_batch
+
+# Hints are stored as ints: 0-8 for an opened space, or one of the negative sentinels below
+UNKNOWN, MINE = -1, -2
+SYMBOLS = ('0', '1', '2', '3', '4', '5', '6', '7', '8', 'x', '?')  # hint -> symbol (sentinels index from the end)
+HINTS = {symbol: hint for hint, symbol in zip((*range(9), MINE, UNKNOWN), SYMBOLS)}  # symbol -> hint
 
 
 class GameState:
     """Represents a single game of Minesweeper"""
 
+    __slots__ = ('_lookup', '_nrows', '_ncols', '_nmines', '_nfound', '_unknowns', '_dirty', '_frontier', '_interned')
+
     def __init__(self):
         self._lookup = None
         self._nrows = 0
@@ -16,7 +23,9 @@ class GameState:
         self._nmines = 0
         self._nfound = 0
         self._unknowns = None
-        self._remaining_zones = None
+        self._dirty = None  # positions of the squares whose surroundings changed since _propagate last saw them
+        self._frontier = None  # positions of the opened squares that still have '?'s around them
+        self._interned = {}  # zone -> the one int object standing for that zone in every Gridspace.zones
 
     def _open(self, row: int, col: int) -> None:
         """
@@ -27,34 +36,45 @@ class GameState:
         :return: None
         """
 
-        this_space = self._lookup[(row, col)]
-
-        # remove this space from unknowns
-        if this_space.position in self._unknowns:
-            self._unknowns.pop(this_space.position)
-
-        # open this space
-        n_hinted = open(row, col)
-        this_space.hint = str(n_hinted)
-        n_marked = sum(
-            1 for neighbor in this_space.neighbors.values() if neighbor and self._lookup[neighbor].hint == 'x')
-        this_space.num_undiscovered = n_hinted - n_marked
-
-        # open safe neighbors
-        if this_space.num_undiscovered == 0:
-            safe_by_proxy = {neighbor for neighbor in this_space.neighbors.values() if
-                             neighbor and self._lookup[neighbor].hint == '?'}
-            for pos in safe_by_proxy:
-                self._open(*pos)
-
-        # remove this space from any zones it was in.
-        for tie in this_space.ties:
-            for zone in list(self._lookup[tie].zones):
-                if this_space.position in zone:
-                    new_zone = zone - {this_space.position}
-                    freq = self._lookup[tie].zones.pop(zone)
-                    if new_zone:
-                        self._lookup[tie].zones[new_zone] = freq
+        # Work through the squares to open breadth-first, a whole layer per call to open_batch;
+        #  each square is queued at most once
+        layer = [(row, col)]
+        queued = {(row, col)}
+        while layer:
+            next_layer = []
+            for pos, hint in zip(layer, open_batch(layer)):
+                this_space = self._lookup[pos]
+
+                # remove this space from unknowns
+                self._unknowns.discard(pos)
+
+                # open this space
+                if this_space.hint == UNKNOWN:
+                    self._lose_unknown(this_space)
+                this_space.hint = hint
+                if this_space.num_unknown:
+                    self._frontier.add(pos)
+                this_space.num_undiscovered = this_space.hint - this_space.num_marked
+                self._dirty.add(pos)
+                self._dirty.update(this_space.neighbors)
+
+                # queue up safe neighbors
+                if this_space.num_undiscovered == 0:
+                    for neighbor in this_space.neighbors:
+                        if neighbor not in queued and self._lookup[neighbor].hint == UNKNOWN:
+                            next_layer.append(neighbor)
+                            queued.add(neighbor)
+
+                # remove this space from any zones it was in.
+                bit = self._zone_of([pos])
+                for tie in this_space.ties:
+                    for zone in list(self._lookup[tie].zones):
+                        if zone & bit:
+                            new_zone = zone & ~bit
+                            freq = self._lookup[tie].zones.pop(zone)
+                            if new_zone:
+                                self._lookup[tie].zones[new_zone] = freq
+            layer = next_layer
 
     def _mark(self, row: int, col: int) -> None:
         """
@@ -68,24 +88,28 @@ class GameState:
         this_space = self._lookup[(row, col)]
 
         # remove this space from unknowns
-        if this_space.position in self._unknowns:
-            self._unknowns.pop(this_space.position)
+        self._unknowns.discard(this_space.position)
 
         # mark this space as a mine
-        if this_space.hint == '?':
-            this_space.hint = 'x'
+        if this_space.hint == UNKNOWN:
+            this_space.hint = MINE
             self._nfound += 1
+            self._lose_unknown(this_space)
+            for neighbor in this_space.neighbors:
+                self._lookup[neighbor].num_marked += 1
+            self._dirty.update(this_space.neighbors)
 
         # alert neighbors
-        for neighbor in this_space.neighbors.values():
-            if neighbor and self._lookup[neighbor].num_undiscovered > 0:
+        for neighbor in this_space.neighbors:
+            if self._lookup[neighbor].num_undiscovered > 0:
                 self._lookup[neighbor].num_undiscovered -= 1
 
         # remove this space from any zones it was in.
+        bit = self._zone_of([this_space.position])
         for tie in this_space.ties:
             for zone in list(self._lookup[tie].zones):
-                if this_space.position in zone:
-                    new_zone = zone - {this_space.position}
+                if zone & bit:
+                    new_zone = zone & ~bit
                     freq = self._lookup[tie].zones.pop(zone)
                     if new_zone:
                         self._lookup[tie].zones[new_zone] = freq - 1 if freq > 0 else freq
@@ -103,59 +127,89 @@ class GameState:
             print(repr(self), "\n")
 
         for pos, space in self._lookup.items():
-            if space.hint == '0':
-                for neighbor in space.neighbors.values():
-                    if neighbor and self._lookup[neighbor].hint == '?':
+            if space.hint == 0:
+                for neighbor in space.neighbors:
+                    if self._lookup[neighbor].hint == UNKNOWN:
                         self._open(*neighbor)
         if display:
             print('After "Open Zeros":')
             print(repr(self), "\n")
 
-    def _mark_spaces(self, display: bool = False) -> int:
+    def _propagate(self, display: bool = False) -> bool:
         """
-        Deduce which squares are holding mines based off visible hints & mark them w/ an 'x'.
+        Deduce which squares are holding mines & which ARE NOT based off visible hints; mark the former w/ an 'x' &
+        'open' the latter. Only hints whose surroundings changed are revisited, until none of them yields anything new.
 
         :param display: Prints board state after execution if True
-        :return: # of mines found during this invocation
+        :return: True if board state was altered during this invocation
         """
 
-        nfound = 0
-        for space in self._lookup.values():
-            if space.hint.isnumeric():
-                proximity = int(space.hint)
-                if proximity > 0 and proximity == sum(
-                        1 for neighbor in space.neighbors.values() if neighbor and self._lookup[neighbor].hint in 'x?'):
-                    for neighbor in space.neighbors.values():
-                        if neighbor and self._lookup[neighbor].hint == '?':
-                            self._mark(*neighbor)
-                            nfound += 1
-        if display and nfound:
-            print('After "Mark Spaces":')
+        board_altered = False
+        while self._dirty:
+            space = self._lookup[self._dirty.pop()]
+            if space.hint <= 0 or not space.num_unknown:
+                continue
+            if space.hint == space.num_marked:
+                settle = self._open
+            elif space.hint == space.num_marked + space.num_unknown:
+                settle = self._mark
+            else:
+                continue
+            for neighbor in space.neighbors:
+                if self._lookup[neighbor].hint == UNKNOWN:
+                    settle(*neighbor)
+                    board_altered = True
+        if display and board_altered:
+            print('After "Propagate":')
             print(repr(self), "\n")
-        return nfound
+        return board_altered
 
-    def _open_safe_spaces(self, display: bool = False) -> bool:
+    def _lose_unknown(self, space: 'Gridspace') -> None:
         """
-        Deduce which squares ARE NOT holding mines based off visible hints & 'open' them.
+        Updates the neighbors of a '?'-square that is being opened or marked: one less '?' surrounds each of them.
 
-        :param display: Prints board state after execution if True
-        :return: True if board state was altered during this invocation
+        :param space: the square that is no longer a '?'
+        :return: None
         """
 
-        space_unpacked = False
-        for space in self._lookup.values():
-            if space.hint.isnumeric():
-                proximity = int(space.hint)
-                if proximity > 0 and proximity == sum(
-                        1 for neighbor in space.neighbors.values() if neighbor and self._lookup[neighbor].hint == 'x'):
-                    for neighbor in space.neighbors.values():
-                        if neighbor and self._lookup[neighbor].hint == '?':
-                            self._open(*neighbor)
-                            space_unpacked = True
-        if display and space_unpacked:
-            print('After "Open Safe Spaces":')
-            print(repr(self), "\n")
-        return space_unpacked
+        for neighbor in space.neighbors:
+            other = self._lookup[neighbor]
+            other.num_unknown -= 1
+            if not other.num_unknown:
+                self._frontier.discard(neighbor)
+
+    def _zone_of(self, positions: Iterable[Tuple[int, int]]) -> int:
+        """
+        Packs a group of squares into a zone. Zones are bitmasks; bit (row * ncols + col) stands for the square @ (row, col).
+
+        :param positions: the row & column of each square in the group
+        :return: the zone holding exactly those squares
+        """
+
+        zone = 0
+        for row, col in positions:
+            zone |= 1 << (row * self._ncols + col)
+        return zone
+
+    def _intern(self, zone: int) -> int:
+        """
+        Get the canonical object for a zone, so the squares sharing a zone share one key (& dict lookups hit on identity).
+
+        :param zone: a bitmask of squares, as made by _zone_of
+        :return: an int equal to zone; the same object every time for equal zones
+        """
+
+        return self._interned.setdefault(zone, zone)
+
+    def _positions(self, zone: int) -> Generator[Tuple[int, int], Any, None]:
+        """
+        Unpacks a zone into the squares it holds. (inverse of _zone_of)
+
+        :param zone: a bitmask of squares, as made by _zone_of
+        :return: a generator that yields the row & column of each square in zone, in row-major order
+        """
+
+        return (divmod(bit, self._ncols) for bit in bits(zone))
 
     def _make_ties(self) -> None:
         """
@@ -164,82 +218,37 @@ class GameState:
         :return: None
         """
 
-        # get all hint spaces with adjacent '?'s
-        frontier = {neighbor: self._lookup[neighbor] for pos, space in self._unknowns.items() for neighbor in
-                    space.neighbors.values() if neighbor and self._lookup[neighbor].hint.isnumeric()}
-
         # use hints to create "zones" of '?'-squares along the frontier,
         #  detailing the # of mines left to find in each zone.
-        for pos, space in frontier.items():
-            local_unknowns = {coord for coord in space.neighbors.values() if coord in self._unknowns}
+        for pos in self._frontier:
+            space = self._lookup[pos]
+            local_unknowns = {coord for coord in space.neighbors if coord in self._unknowns}
+            key = self._intern(self._zone_of(local_unknowns))
             for unknown in local_unknowns:
-                key = frozenset(local_unknowns)
-                self._lookup[unknown].zones[key] = self._lookup[unknown].zones.setdefault(key, space.num_undiscovered)
-                self._lookup[unknown].zones[key] = min(space.num_undiscovered, self._lookup[unknown].zones[key])
+                zones = self._lookup[unknown].zones
+                freq = zones.get(key)
+                zones[key] = space.num_undiscovered if freq is None else min(freq, space.num_undiscovered)
                 self._lookup[unknown].ties |= local_unknowns - {unknown}
-                self._remaining_zones.update(self._lookup[unknown].zones)
 
         # split overlapping zones into components
-        for unknown in self._unknowns.values():
+        for unknown in map(self._lookup.get, self._unknowns):
+            if len(unknown.zones) < 2:
+                continue  # a zone can't be split against itself
             for zone, num_undiscovered in list(unknown.zones.items()):
                 if zone not in unknown.zones:
                     continue
                 for other_zone, other_num_undiscovered in list(unknown.zones.items()):
-                    if other_zone in unknown.zones:
+                    if other_zone != zone and other_zone in unknown.zones:
                         shared = zone & other_zone
 
-                        if zone < other_zone or (shared and other_num_undiscovered > num_undiscovered):
+                        if shared == zone or (shared and other_num_undiscovered > num_undiscovered):
                             # if "zone" & "other_zone" share members then
                             #  it is possible to split the zone w/ the higher # of mines
                             #   into components, "shared" & "not_shared".
-
-                            # unknown.zones.pop(other_zone)
-
-                            not_shared = other_zone - shared
+                            not_shared = self._intern(other_zone & ~shared)
                             unknown.zones[not_shared] = other_num_undiscovered - num_undiscovered
-                        else:
-                            print(end='')
         return
 
-    """def _expand_ties(self):
-        subzones = {}
-        unknowns = {unknown: space for unknown, space in self._unknowns.items() if any(
-            neighbor and neighbor not in self._unknowns for neighbor in space.neighbors.values())}
-        while True:
-            new_additions = {}
-            for unknown, space in unknowns.items():
-                outer = sorted(space.zones.items(), key=lambda pair: len(pair[0]))
-                for zone, freq in outer:
-                    inner = sorted(space.zones.items(), key=lambda pair: len(pair[0]), reverse=True)
-                    for other_zone, other_freq in inner:
-                        if zone != other_zone:
-                            shared = zone & other_zone
-                            other_exclusive = other_zone - shared
-                            zone_exclusive = zone - shared
-                            if zone < other_zone:
-                                new_freq = other_freq - freq
-                                if other_exclusive and other_exclusive not in new_additions and other_exclusive not in subzones:
-                                    new_additions[other_exclusive] = new_freq
-                            else:
-                                shared_constraint = min(len(shared), freq, other_freq)  # max num mines in shared
-                                if freq - shared_constraint == 1:
-                                    if zone_exclusive and zone_exclusive not in new_additions and zone_exclusive not in subzones:
-                                        new_additions[zone_exclusive] = 1
-                                elif other_freq - shared_constraint == 1:
-                                    if other_exclusive and other_exclusive not in new_additions and other_exclusive not in subzones:
-                                        new_additions[other_exclusive] = 1
-
-            if new_additions:
-                subzones.update(new_additions)
-                print(end='')
-                for _ in range(len(new_additions)):
-                    zone, freq = new_additions.popitem()
-                    for pos in zone:
-                        self._lookup[pos].zones[zone] = freq
-            else:
-                break
-        return
-"""
     def get_solution(self, display=False) -> str:
         """
         Plays a game of Minesweeper until its logical conclusion without making a guess.
@@ -256,17 +265,15 @@ class GameState:
 
         # Find all mines or enter the fail state
         while self._nfound < self._nmines:
-            self._mark_spaces(display)
-            board_altered = self._open_safe_spaces(display)
-            if not board_altered and len(self._unknowns):
+            self._propagate(display)
+            if self._nfound < self._nmines and len(self._unknowns):
                 # Create exclusion zones
                 self._make_ties()
 
-                # self._expand_ties()
-
                 # Find safe spaces
-                safe_spaces = {pos: zone for unknown in self._unknowns.values() for zone, num_undiscovered in
-                               unknown.zones.items() for pos in zone if num_undiscovered == 0}
+                safe_spaces = {pos: zone for unknown in map(self._lookup.get, self._unknowns)
+                               for zone, num_undiscovered in unknown.zones.items() if num_undiscovered == 0
+                               for pos in self._positions(zone)}
 
                 # Open safe spaces
                 for pos, zone in safe_spaces.items():
@@ -276,8 +283,9 @@ class GameState:
                     print(repr(self), "\n")
 
                 # Find mines
-                mines = {pos: zone for unknown in self._unknowns.values() for zone, num_undiscovered in
-                         unknown.zones.items() for pos in zone if num_undiscovered == len(zone)}
+                mines = {pos: zone for unknown in map(self._lookup.get, self._unknowns)
+                         for zone, num_undiscovered in unknown.zones.items() if num_undiscovered == bitcount(zone)
+                         for pos in self._positions(zone)}
 
                 # Mark mines
                 for pos, zone in mines.items():
@@ -286,9 +294,6 @@ class GameState:
                     print('After "Logical Analysis - Mines":')
                     print(repr(self), "\n")
 
-                """remaining_zones = {pos: zone for unknown in self._unknowns.values() for zone, num_undiscovered in 
-                                   unknown.zones.items() for pos in zone}"""
-
                 # Enter fail state if no changes were made to the board
                 if not safe_spaces and not mines:
                     if display:
@@ -328,8 +333,16 @@ class GameState:
         state._ncols = len(board_2d[0])
         state._nmines = nmines
         state._lookup = boardtohashmap(board_2d)
-        state._unknowns = {pos: space for pos, space in state._lookup.items() if space.hint == '?'}
-        state._remaining_zones = {}
+        state._unknowns = {pos for pos, space in state._lookup.items() if space.hint == UNKNOWN}
+        state._dirty = {pos for pos, space in state._lookup.items() if space.hint > 0}
+
+        # Count the '?'s & 'x's around every square once; _open & _mark keep the counts current from here on
+        nunknown = neighbor_sums([[1 if hint == '?' else 0 for hint in row] for row in board_2d])
+        nmarked = neighbor_sums([[1 if hint == 'x' else 0 for hint in row] for row in board_2d])
+        for space in state._lookup.values():
+            space.num_unknown = nunknown[space.row][space.col]
+            space.num_marked = nmarked[space.row][space.col]
+        state._frontier = {pos for pos, space in state._lookup.items() if space.hint >= 0 and space.num_unknown}
         return state
 
     def __str__(self):
@@ -342,24 +355,21 @@ class GameState:
 class Gridspace:
     """Represents a space on the board which is aware of its neighbors & the # of mines around it."""
 
-    def __init__(self, r: int, c: int, hint: str, nrows: int, ncols: int):
+    __slots__ = ('row', 'col', 'hint', 'ties', 'neighbors', 'num_undiscovered', 'num_unknown', 'num_marked', 'zones')
+
+    def __init__(self, r: int, c: int, hint: int, nrows: int, ncols: int):
         self.row = r
         self.col = c
         self.hint = hint
         self.ties = set()
-        self.neighbors = {
-            'up': (r - 1, c) if r - 1 > -1 else None,
-            'left': (r, c - 1) if c - 1 > -1 else None,
-            'down': (r + 1, c) if r + 1 < nrows else None,
-            'right': (r, c + 1) if c + 1 < ncols else None,
-            'top_left': (r - 1, c - 1) if r - 1 > -1 and c - 1 > -1 else None,
-            'bottom_left': (r + 1, c - 1) if r + 1 < nrows and c - 1 > -1 else None,
-            'top_right': (r - 1, c + 1) if r - 1 > -1 and c + 1 < ncols else None,
-            'bottom_right': (r + 1, c + 1) if r + 1 < nrows and c + 1 < ncols else None
-        }
+        self.neighbors = tuple(
+            (row, col) for row in range(r - 1, r + 2) for col in range(c - 1, c + 2)
+            if (row, col) != (r, c) and -1 < row < nrows and -1 < col < ncols
+        )
         self.num_undiscovered = -1
+        self.num_unknown = 0  # '?'s surrounding this space
+        self.num_marked = 0  # 'x's surrounding this space
         self.zones = {}
-        self.subzones = {}
 
 
     @property
@@ -372,11 +382,11 @@ class Gridspace:
         return self.row, self.col
 
     def __str__(self):
-        return f'({self.row},{self.col}): {self.hint}: {self.num_undiscovered}'
+        return f'({self.row},{self.col}): {SYMBOLS[self.hint]}: {self.num_undiscovered}'
 
     def __repr__(self):
         return f'{{Position: ({self.row},{self.col}) | ' \
-               f'Hint: {self.hint} | ' \
+               f'Hint: {SYMBOLS[self.hint]} | ' \
                f'# Undiscovered mines in vicinity: {self.num_undiscovered}}}'
 
 
@@ -390,7 +400,7 @@ def boardtohashmap(board_2d: List[List[str]]) -> Dict[Tuple[int, int], Gridspace
 
     nrows, ncols = len(board_2d), len(board_2d[0])
     return {
-        (r, c): Gridspace(r, c, board_2d[r][c], nrows, len(board_2d[r]))
+        (r, c): Gridspace(r, c, HINTS[board_2d[r][c]], nrows, len(board_2d[r]))
         for r in range(nrows) for c in range(len(board_2d[r]))
     }
 
@@ -399,13 +409,15 @@ def hashmaptostring(hashmap: Dict[Tuple[int, int], Gridspace], nrows: int, ncols
     """
     Get a string representation of the 2d-board state during play.
 
-    :param hashmap: a dictionary representing the 2d-board during play
+    :param hashmap: a dictionary representing the 2d-board during play (in row-major order, as boardtohashmap makes it)
     :param nrows: # of rows in the 2d-board
     :param ncols: # of columns in the 2d-board
     :return: a string representation of the 2d-board state during play
     """
 
-    return "\n".join(" ".join(hashmap[(r, c)].hint for c in range(ncols)) for r in range(nrows))
+    # Read the symbols straight off the spaces in order, then cut them into rows
+    symbols = [SYMBOLS[space.hint] for space in hashmap.values()]
+    return "\n".join(" ".join(symbols[r * ncols:(r + 1) * ncols]) for r in range(nrows))
 
 
 def splitgrid(gridstr: str) -> List[List[str]]:
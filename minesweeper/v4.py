@@ -1,8 +1,15 @@
 #  Copyright (c) 2020. Christopher J Maxwell <contact@christopherjmaxwell.com>
-from typing import Any, Dict, FrozenSet, Generator, List, Set, Tuple
+from collections import deque
+from functools import lru_cache
+from itertools import combinations
+from typing import Any, Dict, Generator, Iterable, List, Set, Tuple
 
 import minesweeper
-from minesweeper import open
+from minesweeper import COUNT_SYMBOLS, bitcount, bits, neighbor_sums, open
+
+HINTS = {symbol: hint for hint, symbol in enumerate(COUNT_SYMBOLS)}  # hint square symbol -> # of surrounding mines
+
+DISPLAY = False  # Prints board state & progress during execution if True
 
 
 def solve_mine(map: str, n: int) -> str:
@@ -14,213 +21,241 @@ def solve_mine(map: str, n: int) -> str:
     :return: The solved board or a single '?' if solution could not be found.
     """
 
-    def get_board_str() -> str:
-        """
-        Returns a string representation of the board state.
+    return SolverState([line.split(' ') for line in map.splitlines()], n).get_solution()
 
-        :return: The current board state as a string.
-        """
 
-        return "\n".join(" ".join(row) for row in board)
-
-    board = [line.split(' ') for line in map.splitlines()]
-    nrows, ncols = len(board), len(board[0])
-    unknowns = {(rnum, cnum) for rnum in range(nrows) for cnum in range(ncols) if board[rnum][cnum] == '?'}
-    frontier = None
-    result = '?'
-    nmines_remaining = n
-    num_unknown = -1
-    heuristics = [basic_analysis, inclusive_deduction, exclusive_deduction, numerical_deduction]
-
-    print("\nSolving board...")
-
-    # Analysis Loop:
-    #   - Loops until board is solved or until all heuristics have failed.
-    idx = 0
-    while idx < len(heuristics):
-        if idx == 0:
-            # Find hint squares with adjacent ?s
-            frontier = {(rnum, cnum) for pos in unknowns for rnum, cnum in get_neighbors(*pos, board) if
-                        board[rnum][cnum].isnumeric()}
-            num_unknown = len(unknowns)
-            print(get_board_str(), '\n')
-
-        # Perform heuristic
-        nmines_remaining = heuristics[idx](board, frontier, nmines_remaining, unknowns)
-
-        # Check if board was altered
-        if len(unknowns) < num_unknown:
-            if not unknowns:
-                # Solution was found
-                result = get_board_str()
-                break
-            else:
-                # Repeat evaluation from first heuristic
-                idx = 0
-        else:
-            # Try the next heuristic
-            idx += 1
+class SolverState:
+    """Represents a single game of Minesweeper being solved by the heuristics below"""
 
-    message = "No changes detected... giving up..." if result == '?' else "Solution Found!"
-    print(get_board_str(), message, sep='\n')
-    return result
-
-
-# Utility Functions
-def get_neighbors(rnum: int, cnum: int, board: List[List[str]]) -> Generator[Tuple[int, int], Any, None]:
-    """
-    Yields the co-ordinates of all squares surrounding the square @ (rnum, cnum).
+    __slots__ = ('_board', '_ncols', '_neighbors', '_unknowns', '_remaining', '_frontier', '_nmines_remaining',
+                 '_groups')
 
-    :param rnum: Row # of target square.
-    :param cnum: Column # of target square.
-    :param board: The current board state.
-    :return: A generator that yields the positions of squares neighboring (rnum, cnum).
-    """
-
-    nrows, ncols = len(board), len(board[0])
-    return (
-        (rnum + roffset, cnum + coffset)
-        for roffset in range(-1, 2) for coffset in range(-1, 2)
-        if (roffset or coffset) and (-1 < rnum + roffset < nrows) and (-1 < cnum + coffset < ncols)
-    )
+    def __init__(self, board: List[List[str]], nmines: int):
+        """
+        :param board: a 2d list representing the start state of the board.
+        :param nmines: # of mines that are hidden behind '?'s on the board.
+        """
 
+        nrows, ncols = len(board), len(board[0])
+        self._board = board
+        self._ncols = ncols
+        self._neighbors = get_neighbor_table(nrows, ncols)
+        self._unknowns = {(rnum, cnum) for rnum in range(nrows) for cnum in range(ncols) if board[rnum][cnum] == '?'}
+        self._remaining = set(self._unknowns)  # the ?s as of the last change to the board
+        self._nmines_remaining = nmines
+        self._groups = None  # the groups found on the board since its last change (see _get_groups)
 
-def get_groups(board: List[List[str]], frontier: Set[Tuple[int, int]], unknowns: Set[Tuple[int, int]]) -> Dict[
-    FrozenSet[Tuple[int, int]], int]:
-    """
-    Returns a dictionary of grouped ?s squares & the # of mines contained in each group.
+        # Find hint squares with adjacent ?s
+        self._frontier = {(nrnum, ncnum) for rnum, cnum in self._unknowns
+                          for nrnum, ncnum in self._neighbors[rnum][cnum] if board[nrnum][ncnum].isnumeric()}
 
-    :param board: a 2d list representing the current board for a game of minesweeper.
-    :param frontier: a set of co-ordinate pairs representing the outer-most ring of known hint squares.
-    :param unknowns: a set containing co-ordinate pairs for all ?s on the board.
-    :return: a dictionary that has Frozensets of frontier-adjacent ?s as keys & the # of mines per set as values
-    """
+    def get_solution(self) -> str:
+        """
+        Plays a game of Minesweeper until its logical end without guessing.
 
-    groups = {
-        # key: A hashable set of ?s surrounding a given pos on the frontier
-        # value: The # of mines hidden in that set
-        frozenset(neighbor for neighbor in get_neighbors(*pos, board) if neighbor in unknowns)
-        : count_remaining_mines(pos, board) for pos in frontier
-    }
-    return groups
+        :return: The solved board as a string or a single '?'
+        """
 
+        result = '?'
+        heuristics = [self.basic_analysis, self.inclusive_deduction, self.exclusive_deduction,
+                      self.numerical_deduction]
+
+        if DISPLAY:
+            print("\nSolving board...")
+
+        # Analysis Loop:
+        #   - Loops until board is solved or until all heuristics have failed.
+        idx = 0
+        while idx < len(heuristics):
+            if idx == 0 and DISPLAY:
+                print(self, '\n')
+
+            # Perform heuristic
+            heuristics[idx]()
+
+            # Check if board was altered
+            if len(self._unknowns) < len(self._remaining):
+                if not self._unknowns:
+                    # Solution was found
+                    result = str(self)
+                    break
+                else:
+                    # Update the frontier around the squares just opened or flagged
+                    #   & repeat evaluation from first heuristic
+                    changed = self._remaining - self._unknowns
+                    self._remaining -= changed
+                    self._refresh_frontier(changed)
+                    self._groups = None
+                    idx = 0
+            else:
+                # Try the next heuristic
+                idx += 1
 
-def flag(*args, **kwargs) -> str:
-    """
-    Returns the string representation of a mine.
+        if DISPLAY:
+            message = "No changes detected... giving up..." if result == '?' else "Solution Found!"
+            print(self, message, sep='\n')
+        return result
 
-    :return: a single 'x'
-    """
-    return 'x'
+    def _refresh_frontier(self, changed: Iterable[Tuple[int, int]]) -> None:
+        """
+        Updates the frontier after some ?s have been opened or flagged. (Only squares in or around those can change)
 
+        :param changed: the co-ordinates of the squares that were ?s before the last change to the board.
+        :return: None
+        """
 
-def count_remaining_mines(pos: Tuple[int, int], board: List[List[str]]) -> int:
-    """
-    Returns the # of mines yet to be flagged around a given position on the board.
+        board, neighbors, unknowns, frontier = self._board, self._neighbors, self._unknowns, self._frontier
+        for rnum, cnum in changed:
+            for nrnum, ncnum in ((rnum, cnum), *neighbors[rnum][cnum]):
+                if board[nrnum][ncnum] in HINTS and not unknowns.isdisjoint(neighbors[nrnum][ncnum]):
+                    frontier.add((nrnum, ncnum))
+                else:
+                    frontier.discard((nrnum, ncnum))
 
-    :param pos: (x,y) co-ordinates of the spot on the board to examine. [(0,0) is top-leftmost]
-    :param board: a 2d list representing the current board for a game of minesweeper
-    :return: the # of mines still hidden around the specified space.
-    """
-    return int(board[pos[0]][pos[1]]) - sum(1 for npos in get_neighbors(*pos, board) if board[npos[0]][npos[1]] == 'x')
+    def _get_groups(self) -> Dict[int, int]:
+        """
+        Returns a dictionary of grouped ?s squares & the # of mines contained in each group.
+        (Only re-groups when the board has changed since the last call)
 
+        :return: a dictionary that has groups (see to_group) of frontier-adjacent ?s as keys & the # of mines per group as values
+        """
 
-# Heuristic Functions
-def basic_analysis(board: List[List[str]], frontier: Set[Tuple[int, int]], nmines_remaining: int,
-                   unknowns: Set[Tuple[int, int]]) -> int:
-    """
-    Deduces & opens safe spaces, flags suspected mines using the exposed hint squares on the board.
+        if self._groups is None:
+            unknowns = self._unknowns
+            self._groups = {
+                # key: A bitmask of the ?s surrounding a given pos on the frontier
+                # value: The # of mines hidden in that group
+                to_group((neighbor for neighbor in self._neighbors[rnum][cnum] if neighbor in unknowns), self._ncols)
+                : self._count_remaining_mines(rnum, cnum) for rnum, cnum in self._frontier
+            }
+        return self._groups
+
+    def _count_remaining_mines(self, rnum: int, cnum: int) -> int:
+        """
+        Returns the # of mines yet to be flagged around a given position on the board.
 
-    :param board: a 2d list representing the current board for a game of minesweeper.
-    :param frontier: a set of co-ordinate pairs representing the outer-most ring of known hint squares.
-    :param nmines_remaining: # of mines still hidden on the board.
-    :param unknowns: a set containing co-ordinate pairs for all ?s on the board.
-    :return: The # of mines still hidden after execution.
-    """
+        :param rnum: Row # of the square to examine. [(0,0) is top-leftmost]
+        :param cnum: Column # of the square to examine.
+        :return: the # of mines still hidden around the specified space.
+        """
 
-    print("Basic analysis:")
-    # For each square on the frontier,
-    for rnum, cnum in frontier:
-        hint = int(board[rnum][cnum])
-        local_unknowns, local_mines = set(), set()
-
-        # Group neighboring squares into sets of local_mines & local_unknowns
-        for pos in get_neighbors(rnum, cnum, board):
-            if board[pos[0]][pos[1]] == 'x':
-                local_mines.add(pos)
-            elif board[pos[0]][pos[1]] == '?':
-                local_unknowns.add(pos)
-
-        # If all mines around this square have been found
-        #   then open all neighboring unknown squares.
-        if hint <= len(local_mines):
-            for pos in local_unknowns:
-                if pos in unknowns:
-                    unknowns.remove(pos)
-                    board[pos[0]][pos[1]] = str(open(*pos))
-
-        # If the number of remaining mines around this square
-        #   equals the number of unknowns around this square
-        #   then flag those unknowns as mines.
-        elif hint == len(local_mines) + len(local_unknowns):
-            for pos in local_unknowns:
-                if pos in unknowns:
-                    unknowns.remove(pos)
-                    board[pos[0]][pos[1]] = str(flag(*pos))
-                    nmines_remaining -= 1
-    return nmines_remaining
-
-
-def inclusive_deduction(board: List[List[str]], frontier: Set[Tuple[int, int]], nmines_remaining: int,
-                        unknowns: Set[Tuple[int, int]]) -> int:
-    """
-    Deduces & opens safe spaces, flags suspected mines using set deductions on supersets of eclipsed subsets.
+        board = self._board
+        return HINTS[board[rnum][cnum]] - sum(1 for nrnum, ncnum in self._neighbors[rnum][cnum]
+                                              if board[nrnum][ncnum] == 'x')
 
-    :param board: a 2d list representing the current board for a game of minesweeper.
-    :param frontier: a set of co-ordinate pairs representing the outer-most ring of known hint squares.
-    :param nmines_remaining: # of mines still hidden on the board.
-    :param unknowns: a set containing co-ordinate pairs for all ?s on the board.
-    :return: The # of mines still hidden after execution.
-    """
+    # Heuristics
+    def basic_analysis(self) -> None:
+        """
+        Deduces & opens safe spaces, flags suspected mines using the exposed hint squares on the board.
 
-    print("No changes detected... attempting Advanced Analysis: Inclusive Deduction...\n")
-    print("Advanced analysis - inclusive deduction:")
-    groups = get_groups(board, frontier, unknowns)
+        :return: None
+        """
 
-    new_groups = {}  # newly derived groups & the # of mines in them
-    parents = {}  # source groups for the derived groups & the sets of their children
+        if DISPLAY:
+            print("Basic analysis:")
+        board, neighbors, unknowns = self._board, self._neighbors, self._unknowns
+
+        # Count the mines & the mines + unknowns around every square in two passes over the whole board
+        #   (Both counts are kept current below as squares are opened & flagged)
+        nmarked = neighbor_sums([[1 if square == 'x' else 0 for square in row] for row in board])
+        nhidden = neighbor_sums([[1 if square in ('x', '?') else 0 for square in row] for row in board])
+
+        # For each square on the frontier, & each hint square around a square changed along the way,
+        #   (Runs until nothing more can be decided, so the analysis loop need not rebuild the frontier for every step)
+        worklist, queued = deque(self._frontier), set(self._frontier)
+        pop, push, forget, remember = worklist.popleft, worklist.append, queued.discard, queued.add
+        while worklist:
+            rnum, cnum = square = pop()
+            forget(square)
+            hint = HINTS[board[rnum][cnum]]
+
+            # If all mines around this square have been found
+            #   then open all neighboring unknown squares.
+            if hint <= nmarked[rnum][cnum]:
+                targets = unknowns.intersection(neighbors[rnum][cnum])
+                unknowns -= targets
+                for pos in targets:
+                    board[pos[0]][pos[1]] = COUNT_SYMBOLS[open(*pos)]
+                counts, change = nhidden, -1
+
+            # If the number of remaining mines around this square
+            #   equals the number of unknowns around this square
+            #   then flag those unknowns as mines.
+            elif hint == nhidden[rnum][cnum]:
+                targets = unknowns.intersection(neighbors[rnum][cnum])
+                unknowns -= targets
+                for pos in targets:
+                    board[pos[0]][pos[1]] = 'x'
+                self._nmines_remaining -= len(targets)
+                counts, change = nmarked, 1
+            else:
+                continue
+
+            # Update the counts around each changed square & queue the hint squares in & around it for another look
+            for pos in targets:
+                trnum, tcnum = pos
+                if pos not in queued and board[trnum][tcnum] in HINTS:
+                    remember(pos)
+                    push(pos)
+                for npos in neighbors[trnum][tcnum]:
+                    nrnum, ncnum = npos
+                    counts[nrnum][ncnum] += change
+                    if npos not in queued and board[nrnum][ncnum] in HINTS:
+                        remember(npos)
+                        push(npos)
+
+    def inclusive_deduction(self) -> None:
+        """
+        Deduces & opens safe spaces, flags suspected mines using set deductions on supersets of eclipsed subsets.
 
-    # Note: As it is not possible to add/remove element pairs to/from the parents dictionary during iteration,
-    new_children = {}  # new_children is used to hold intended updates and is merged w/ parents after iteration.
+        :return: None
+        """
 
-    # Find the groups which exist entirely inside larger groups
-    for group, nmines in groups.items():
-        for other, other_nmines in groups.items():
-            if group < other:
-                # Break the larger group into its components:
-                # (1. Elements shared between both groups
-                # & 2. Elements unique to the larger group)
-                same = group & other
-                other_remaining = other - group
-
-                # Save the component groups & the # of mines in them
-                #   (Note same == group therefore the # of mines in same == # mines in group)
-                new_groups[same] = nmines
-                new_groups[other_remaining] = other_nmines - nmines
-
-                # Track the sources of the component groups
-                parents[other] = parents.setdefault(other, set())
-                parents[other].add(same)
-                parents[other].add(other_remaining)
-
-    for parent, children in parents.items():
-        for child in children:
-            for other_child in children:
-                if child.isdisjoint(other_child):
+        if DISPLAY:
+            print("No changes detected... attempting Advanced Analysis: Inclusive Deduction...\n")
+            print("Advanced analysis - inclusive deduction:")
+        board, unknowns, ncols = self._board, self._unknowns, self._ncols
+        groups = self._get_groups()
+        group_list = list(groups.items())
+        by_square = index_groups(group_list)
+
+        new_groups = {}  # newly derived groups & the # of mines in them
+        parents = {}  # source groups for the derived groups & the sets of their children
+
+        # Note: As it is not possible to add/remove element pairs to/from the parents dictionary during iteration,
+        new_children = {}  # new_children is used to hold intended updates and is merged w/ parents after iteration.
+
+        # Find the groups which exist entirely inside larger groups
+        for group, nmines in group_list:
+            # Only the groups holding every ? in group can contain it (kept in order, as if comparing every pair)
+            candidates = set.intersection(*(by_square[bit] for bit in bits(group))) if group else range(len(group_list))
+            for other, other_nmines in (group_list[idx] for idx in sorted(candidates)):
+                # (Every candidate already holds all of group, so it eclipses group unless it is group itself)
+                if other != group:
+                    # Break the larger group into its components:
+                    # (1. Elements shared between both groups
+                    # & 2. Elements unique to the larger group)
+                    same = group & other
+                    other_remaining = other & ~group
+
+                    # Save the component groups & the # of mines in them
+                    #   (Note same == group therefore the # of mines in same == # mines in group)
+                    new_groups[same] = nmines
+                    new_groups[other_remaining] = other_nmines - nmines
+
+                    # Track the sources of the component groups
+                    parents[other] = parents.setdefault(other, set())
+                    parents[other].add(same)
+                    parents[other].add(other_remaining)
+
+        for parent, children in parents.items():
+            # (A pair of children gives the same new child whichever way round it is taken, so visit each pair once)
+            for child, other_child in combinations(children, 2):
+                if not child & other_child:
                     # Make new child sets from the parent
                     # by excluding elements which belong to
                     # DISJOINT existing children.
-                    new_child = parent - child - other_child
+                    new_child = parent & ~child & ~other_child
                     if new_child:
                         # Treat the new child as a "component group" & save it as such
                         new_groups[new_child] = groups[parent] - new_groups[child] - new_groups[other_child]
@@ -230,85 +265,156 @@ def inclusive_deduction(board: List[List[str]], frontier: Set[Tuple[int, int]],
                         new_children[parent] = new_children.setdefault(parent, set())
                         new_children[parent].add(new_child)
 
-    # Merge temporary collection with "parents"
-    for _ in range(len(new_children)):
-        parent, children = new_children.popitem()
-        parents[parent] |= children"""
-
-    # Update the board with the results of analysis
-    for group, nmines in new_groups.items():
-        # if a group is found to contain only mines
-        #   mark every spot in that group as a mine.
-        if len(group) == nmines:
-            for pos in group:
-                if pos in unknowns:
-                    unknowns.remove(pos)
-                    board[pos[0]][pos[1]] = str(flag(*pos))
-                    nmines_remaining -= 1
-
-        # if a group is found not to contain any mines
-        #   open every spot in that group.
-        elif not nmines:
-            for pos in group:
-                if pos in unknowns:
-                    unknowns.remove(pos)
-                    board[pos[0]][pos[1]] = str(open(*pos))
-    return nmines_remaining
-
-
-def exclusive_deduction(board: List[List[str]], frontier: Set[Tuple[int, int]], nmines_remaining: int,
-                        unknowns: Set[Tuple[int, int]]) -> int:
+        # Merge temporary collection with "parents"
+        for _ in range(len(new_children)):
+            parent, children = new_children.popitem()
+            parents[parent] |= children"""
+
+        # Gather the results of analysis
+        mines = safe = 0
+        for group, nmines in new_groups.items():
+            # if a group is found to contain only mines
+            #   every spot in that group is a mine.
+            if bitcount(group) == nmines:
+                mines |= group
+
+            # if a group is found not to contain any mines
+            #   every spot in that group is safe.
+            elif not nmines:
+                safe |= group
+
+        # Update the board with the results of analysis
+        targets = unknowns.intersection(get_squares(mines, ncols))
+        unknowns -= targets
+        for pos in targets:
+            board[pos[0]][pos[1]] = 'x'
+        self._nmines_remaining -= len(targets)
+
+        targets = unknowns.intersection(get_squares(safe, ncols))
+        unknowns -= targets
+        for pos in targets:
+            board[pos[0]][pos[1]] = COUNT_SYMBOLS[open(*pos)]
+
+    def exclusive_deduction(self) -> None:
+        """
+        Identifies & flags the next mine using set deductions on overlapping (but not eclipsing) sets.
+
+        :return: None
+        """
+
+        if DISPLAY:
+            print("No changes detected... attempting Advanced Analysis - Exclusive Deduction...\n")
+            print("Advanced analysis - exclusive deduction:")
+        board, unknowns, ncols = self._board, self._unknowns, self._ncols
+        group_list = list(self._get_groups().items())
+        by_square = index_groups(group_list)
+
+        # Find the groups which overlap one another
+        for group, nmines in group_list:
+            # Only the groups sharing a ? w/ group can overlap it (kept in order, as if comparing every pair)
+            candidates = set().union(*(by_square[bit] for bit in bits(group)))
+            for other, other_nmines in (group_list[idx] for idx in sorted(candidates)):
+                same = group & other
+                if same and group != other:
+                    group_remaining = group & ~same
+                    other_remaining = other & ~same
+                    ngroup_remaining, nother_remaining = bitcount(group_remaining), bitcount(other_remaining)
+
+                    # Find the max # of mines that can exist
+                    #  in the overlap of group & other
+                    #  (Any mines a group has beyond that must be in its remainder)
+                    max_allowed_in_same = min(nmines, other_nmines, bitcount(same))
+
+                    if max_allowed_in_same < nmines or max_allowed_in_same < other_nmines:
+                        if group_remaining and nmines - max_allowed_in_same == ngroup_remaining:
+                            target = group_remaining
+                        elif other_remaining and other_nmines - max_allowed_in_same == nother_remaining:
+                            target = other_remaining
+                        else:
+                            continue
+
+                        for pos in get_squares(target, ncols):
+                            if pos in unknowns:
+                                unknowns.remove(pos)
+                                board[pos[0]][pos[1]] = 'x'
+                                self._nmines_remaining -= 1
+                        return
+
+    def numerical_deduction(self) -> None:
+        # TODO: implement Advanced Analysis based of counting # of mines remaining vs # of unknowns
+        if DISPLAY:
+            print("No changes detected... attempting Advanced Analysis - Numerical Deduction...\n")
+            print("Advanced analysis - numerical deduction:")
+            print(self._nmines_remaining)
+
+    def __str__(self):
+        return "\n".join(" ".join(row) for row in self._board)
+
+
+# Utility Functions
+@lru_cache(maxsize=None)
+def get_neighbor_table(nrows: int, ncols: int) -> Tuple[Tuple[Tuple[Tuple[int, int], ...], ...], ...]:
+    """
+    Returns the co-ordinates of all squares surrounding each square of a board. (Built once per board size)
+
+    :param nrows: # of rows on the board.
+    :param ncols: # of columns on the board.
+    :return: A 2d tuple holding, for each square, a tuple of the positions of the squares neighboring it.
+    """
+
+    return tuple(
+        tuple(
+            tuple(
+                (rnum + roffset, cnum + coffset)
+                for roffset in range(-1, 2) for coffset in range(-1, 2)
+                if (roffset or coffset) and (-1 < rnum + roffset < nrows) and (-1 < cnum + coffset < ncols)
+            )
+            for cnum in range(ncols)
+        )
+        for rnum in range(nrows)
+    )
+
+
+def to_group(squares: Iterable[Tuple[int, int]], ncols: int) -> int:
+    """
+    Packs a set of squares into a group. Groups are bitmasks; bit (rnum * ncols + cnum) stands for the square @ (rnum, cnum).
+
+    :param squares: the co-ordinates of each square in the group.
+    :param ncols: # of columns on the board.
+    :return: the group holding exactly those squares.
+    """
+
+    group = 0
+    for rnum, cnum in squares:
+        group |= 1 << (rnum * ncols + cnum)
+    return group
+
+
+def get_squares(group: int, ncols: int) -> Generator[Tuple[int, int], Any, None]:
+    """
+    Yields the co-ordinates of the squares in a group. (inverse of to_group)
+
+    :param group: a bitmask of squares, as made by to_group.
+    :param ncols: # of columns on the board.
+    :return: A generator that yields the positions of the squares in group, in row-major order.
+    """
+
+    return (divmod(bit, ncols) for bit in bits(group))
+
+
+def index_groups(groups: List[Tuple[int, int]]) -> Dict[int, Set[int]]:
     """
-    Identifies & flags the next mine using set deductions on overlapping (but not eclipsing) sets.
+    Returns a dictionary of the groups each ? belongs to, so groups that overlap can be found without comparing every pair.
 
-    :param board: a 2d list representing the current board for a game of minesweeper.
-    :param frontier: a set of co-ordinate pairs representing the outer-most ring of known hint squares.
-    :param nmines_remaining: # of mines still hidden on the board.
-    :param unknowns: a set containing co-ordinate pairs for all ?s on the board.
-    :return: The # of mines still hidden after execution.
+    :param groups: a list of groups & the # of mines in each, such as list(SolverState._get_groups().items())
+    :return: a dictionary that has the bits of ?s as keys & the set of indices (into groups) of the groups holding them as values
     """
 
-    print("No changes detected... attempting Advanced Analysis - Exclusive Deduction...\n")
-    print("Advanced analysis - exclusive deduction:")
-    groups = get_groups(board, frontier, unknowns)
-
-    # Find the groups which exist entirely inside larger groups
-    for group, nmines in groups.items():
-        for other, other_nmines in groups.items():
-            same = group & other
-            if same and group != other:
-                group_remaining = group - same
-                other_remaining = other - same
-
-                # Find the min # of mines that must exist
-                #  in the overlap of group & other
-                min_allowed_in_same = max(nmines - len(group_remaining), other_nmines - len(other_remaining), 0)
-
-                if min_allowed_in_same:
-                    if nmines - min_allowed_in_same == len(group_remaining):
-                        target = group_remaining
-                    elif other_nmines - min_allowed_in_same == len(other_remaining):
-                        target = other_remaining
-                    else:
-                        continue
-
-                    for pos in target:
-                        if pos in unknowns:
-                            unknowns.remove(pos)
-                            board[pos[0]][pos[1]] = str(flag(*pos))
-                            nmines_remaining -= 1
-                    return nmines_remaining
-    return nmines_remaining
-
-
-def numerical_deduction(board: List[List[str]], frontier: Set[Tuple[int, int]], nmines_remaining: int,
-                        unknowns: Set[Tuple[int, int]]) -> int:
-    # TODO: implement Advanced Analysis based of counting # of mines remaining vs # of unknowns
-    print("No changes detected... attempting Advanced Analysis - Numerical Deduction...\n")
-    print("Advanced analysis - numerical deduction:")
-
-    print(nmines_remaining)
-    return nmines_remaining
+    by_square = {}
+    for idx, (group, _) in enumerate(groups):
+        for bit in bits(group):
+            by_square.setdefault(bit, set()).add(idx)
+    return by_square
 
 
 if __name__ == '__main__':